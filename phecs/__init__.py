@@ -1 +1,10 @@
-from .phecs import World, Entity
+from .phecs import World, Entity, jit_system, numeric_component
+
+
+def __getattr__(name):
+    # prange imports numba, so it is only looked up when asked for.
+    if name == "prange":
+        from . import phecs
+
+        return phecs.prange
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,26 @@
 from __future__ import annotations
 
+import functools
+from itertools import chain
+from operator import attrgetter
 from enum import Enum, auto
-from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
-
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NewType,
+    Optional,
+    Tuple,
+    Type,
+)
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for numeric components
+    np = None
 
 class Error(Enum):
     NoSuchEntity = auto()
@@ -23,32 +41,398 @@ class NoSuchComponent(Exception):
     pass
 
 
-class Entity:
-    def __init__(self, id):
-        self.__id = id
+# Entities are plain ints so the entity index hashes and compares them natively.
+Entity = NewType("Entity", int)
+
+
+_numeric_dtypes: Dict[Type[Any], Any] = {}
+_numeric_packers: Dict[Type[Any], Callable[[Any], tuple]] = {}
+
+_MIN_ARRAY_CAPACITY = 8
+
+
+def numeric_component(dtype: Any) -> Callable[[Type[Any]], Type[Any]]:
+    """
+    Class decorator that stores a component type in NumPy arrays instead of as Python objects.
+
+    Each field of the dtype is read from the attribute of the same name when the
+    component is inserted. Queries then hand out numpy records that write straight
+    through to the array, and find_arrays() hands out whole columns for vectorized systems.
+
+    A record or column only writes through until its entity moves to another
+    archetype, is despawned, or its archetype grows to fit a new entity, which
+    replaces the arrays. Write to it before spawning or inserting, or fetch it again.
+
+    Only find_arrays() and jit_system() are fast. find, get, find_on and iter_every
+    are slower than for plain objects: they hand out numpy records, whose attribute
+    access is slow, and find looks each row up again as it goes.
+
+    Args:
+        dtype (Any): Anything np.dtype accepts, normally a structured dtype like [("x", "f4"), ("y", "f4")].
+
+    Returns:
+        Callable[[Type[Any]], Type[Any]]: A decorator that registers the class and returns it unchanged.
+    """
+    if np is None:
+        raise ImportError("numeric_component requires numpy")
+    dtype = np.dtype(dtype)
+
+    def register(cls: Type[Any]) -> Type[Any]:
+        _numeric_dtypes[cls] = dtype
+        _numeric_packers[cls] = _packer(dtype.names)
+        return cls
+
+    return register
+
+
+@functools.lru_cache(maxsize=None)
+def _numba() -> Any:
+    """
+    Import numba on first use, since importing it is slow. None if it is not installed.
+    """
+    try:
+        import numba
+    except ImportError:  # without numba, jit systems run as plain numpy code
+        return None
+    return numba
+
+
+def __getattr__(name: str) -> Any:
+    # prange is numba.prange, or range without numba. It is resolved lazily so
+    # importing phecs does not import numba.
+    if name == "prange":
+        numba = _numba()
+        return numba.prange if numba is not None else range
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def jit_system(
+    *component_types: Type,
+    has: Optional[Type | List[Type] | Tuple[Type, ...]] = None,
+    without: Optional[Type | List[Type] | Tuple[Type, ...]] = None,
+    cache: bool = False,
+) -> Callable[[Callable[..., Any]], Callable[[World], None]]:
+    """
+    Decorator that compiles a function over numeric component fields into a system.
+
+    The function is called once per matching archetype with one array per dtype
+    field of each component type, in order, followed by the number of entities.
+    It is compiled with numba when numba is installed, and runs as plain numpy
+    code otherwise. Use prange for loops that are safe to run in parallel.
+
+        @jit_system(Position, Velocity)
+        def physics(x, y, dx, dy, n):
+            for i in prange(n):
+                x[i] += dx[i]
+                y[i] += dy[i]
+
+        physics(world)
+
+    Args:
+        *component_types (Type): The numeric component types the function works on.
+        has (Optional[Type | List[Type] | Tuple[Type, ...]]): The component types that the entities must have.
+        without (Optional[Type | List[Type] | Tuple[Type, ...]]): The component types that the entities must not have.
+        cache (bool): Cache the compiled function on disk between runs. Needs the function to live in a file numba can locate, not a REPL or exec.
+
+    Returns:
+        Callable[[Callable[..., Any]], Callable[[World], None]]: A decorator turning the function into a system that takes a world.
+    """
+    for component_type in component_types:
+        if component_type not in _numeric_dtypes:
+            raise TypeError(f"{component_type.__name__} is not a numeric component")
+
+    def decorate(function: Callable[..., Any]) -> Callable[[World], None]:
+        numba = _numba()
+        kernel = (
+            numba.njit(parallel=True, fastmath=True, cache=cache)(function)
+            if numba is not None
+            else function
+        )
+
+        @functools.wraps(function)
+        def system(world: World) -> None:
+            for entities, *columns in world.find_arrays(
+                *component_types, has=has, without=without
+            ):
+                fields = [c[name] for c in columns for name in c.dtype.names]
+                kernel(*fields, len(entities))
+
+        return system
+
+    return decorate
+
+
+def _new_array(dtype: Any, capacity: int) -> Any:
+    return np.zeros(capacity, dtype=dtype).view(np.recarray)
+
+
+def _grow_array(array: Any, capacity: int) -> Any:
+    grown = _new_array(array.dtype, capacity)
+    grown[: len(array)] = array
+    return grown
+
+
+def _packer(names: Tuple[str, ...]) -> Callable[[Any], tuple]:
+    # One attrgetter call reads every field; it returns a bare value for a single name.
+    getter = attrgetter(*names)
+    if len(names) == 1:
+        return lambda component: (getter(component),)
+    return getter
+
+
+def _query_sets(
+    component_types: Tuple[Type, ...],
+    has: Optional[Type | List[Type] | Tuple[Type, ...]],
+    without: Optional[Type | List[Type] | Tuple[Type, ...]],
+) -> Tuple[frozenset, frozenset]:
+    """
+    Fold find's component types and has/without filters into the required and excluded type sets.
+    Results are cached, so a system calling find with the same arguments every frame decodes them once.
+    """
+    if type(has) is list:
+        has = tuple(has)
+    if type(without) is list:
+        without = tuple(without)
+    return _fold_query_sets(component_types, has, without)
+
+
+@functools.lru_cache(maxsize=256)
+def _fold_query_sets(
+    component_types: Tuple[Type, ...],
+    has: Optional[Type | Tuple[Type, ...]],
+    without: Optional[Type | Tuple[Type, ...]],
+) -> Tuple[frozenset, frozenset]:
+    has = has if isinstance(has, tuple) else () if has is None else (has,)
+    without = (
+        without if isinstance(without, tuple) else () if without is None else (without,)
+    )
+    return frozenset(component_types).union(has), frozenset(without)
+
+
+def _unpack(component_type: Type[Any], record: Any) -> Any:
+    component = component_type.__new__(component_type)
+    for name in record.dtype.names:
+        # object.__setattr__ also works on frozen dataclasses.
+        object.__setattr__(component, name, record[name].item())
+    return component
+
+
+# find's row zippers by arity, generated on first use by _row_zipper.
+_row_zippers: Dict[int, Callable[..., zip]] = {}
+
+
+def _row_zipper(arity: int) -> Callable[..., zip]:
+    """
+    Get a function that zips an archetype's entities with the first count rows of some columns.
 
-    def __hash__(self) -> int:
-        return hash(self.__id)
+    The function is generated with the column lookups unrolled for the given
+    number of component types, so find does no per-archetype looping over them.
+    """
+    zip_rows = _row_zippers.get(arity)
+    if zip_rows is None:
+        names = [f"c{i}" for i in range(arity)]
+        source = (
+            f"def zip_rows(entities, columns, count, {', '.join(names)}):\n"
+            f"    return zip(entities, {''.join(f'columns[{n}][:count], ' for n in names)})\n"
+        )
+        namespace: Dict[str, Any] = {}
+        exec(source, namespace)
+        zip_rows = _row_zippers[arity] = namespace["zip_rows"]
+    return zip_rows
 
-    def __repr__(self) -> str:
-        return f"Entity(id={self.__id})"
 
-    def __eq__(self, other_entity: Entity | int) -> bool:
-        if isinstance(other_entity, int):
-            return self.__id == other_entity
-        return self.__id == other_entity.__id
+class Archetype:
+    """
+    Stores every entity that has exactly the same set of component types.
+
+    Components are kept column-wise, one list per component type, so row i of
+    every column belongs to entities[i]. The mask has the bit of every component
+    type set, see World._type_mask. Numeric components get a NumPy record
+    array instead of a list. The entity list and every column grow geometrically
+    together, and only the first count rows are in use.
+
+    add_edges and remove_edges cache which archetype an entity moves to when the
+    given component types are inserted or removed, so moves skip the key lookup.
+    """
 
+    __slots__ = (
+        "columns",
+        "key",
+        "mask",
+        "entities",
+        "count",
+        "add_edges",
+        "remove_edges",
+    )
+
+    def __init__(self, component_types: Iterable[Type[Any]], mask: int) -> None:
+        self.columns: Dict[Type[Any], Any] = {
+            t: _new_array(_numeric_dtypes[t], 0) if t in _numeric_dtypes else []
+            for t in component_types
+        }
+        self.key: frozenset = frozenset(self.columns)
+        self.mask: int = mask
+        self.entities: List[Entity] = []
+        self.count: int = 0
+        self.add_edges: Dict[Tuple[Type[Any], ...], Archetype] = {}
+        self.remove_edges: Dict[Tuple[Type[Any], ...], Archetype] = {}
+
+    def _grow(self) -> None:
+        """
+        Double the capacity of the entity list and every column.
+        Numeric columns are replaced by bigger arrays, so records and views of the old ones stop writing through.
+        """
+        capacity = len(self.entities)
+        grown = max(2 * capacity, _MIN_ARRAY_CAPACITY)
+        self.entities.extend([None] * (grown - capacity))
+        columns = self.columns
+        for component_type, column in columns.items():
+            if type(column) is list:
+                column.extend([None] * (grown - capacity))
+            else:
+                columns[component_type] = _grow_array(column, grown)
+
+    def append(self, entity: Entity, components: Dict[Type[Any], Any]) -> int:
+        """
+        Add an entity and its components as a new row.
 
-class InternalEntity:
-    def __init__(self, entity: Entity):
-        self.entity: Entity = entity
-        self.components: dict[Type[Any], Any] = {}
+        Args:
+            entity (Entity): The entity to add.
+            components (Dict[Type[Any], Any]): The components keyed by type. Must match the archetype key.
+
+        Returns:
+            int: The row the entity was stored at.
+        """
+        row = self._push(entity)
+        self.put(row, components)
+        return row
+
+    def append_moved(
+        self,
+        entity: Entity,
+        source: Archetype,
+        source_row: int,
+        components: Dict[Type[Any], Any],
+    ) -> int:
+        """
+        Add an entity as a new row, copying every component not in components from a row of another archetype.
+
+        Args:
+            entity (Entity): The entity to add.
+            source (Archetype): The archetype the entity is moving out of.
+            source_row (int): The row of the entity in the source archetype.
+            components (Dict[Type[Any], Any]): The new components keyed by type.
+
+        Returns:
+            int: The row the entity was stored at.
+        """
+        row = self._push(entity)
+        source_columns = source.columns
+        for component_type, column in self.columns.items():
+            if component_type not in components:
+                column[row] = source_columns[component_type][source_row]
+        self.put(row, components)
+        return row
+
+    def _push(self, entity: Entity) -> int:
+        """
+        Claim the next row for an entity, growing if full. The caller fills in the columns.
+        """
+        row = self.count
+        if row == len(self.entities):
+            self._grow()
+        self.entities[row] = entity
+        self.count = row + 1
+        return row
+
+    def put(self, row: int, components: Dict[Type[Any], Any]) -> None:
+        """
+        Overwrite components at a row. Every type in components must be in the archetype key.
+        """
+        columns = self.columns
+        for component_type, component in components.items():
+            column = columns[component_type]
+            if type(column) is list:
+                column[row] = component
+            else:
+                column[row] = _numeric_packers[component_type](component)
+
+    def row(self, row: int) -> Dict[Type[Any], Any]:
+        """
+        Get the components stored at a row, keyed by type.
+        Numeric components are copied out of their arrays into new instances.
+        """
+        return {
+            t: column[row] if type(column) is list else _unpack(t, column[row])
+            for t, column in self.columns.items()
+        }
+
+    def swap_remove(self, row: int) -> Optional[Entity]:
+        """
+        Remove a row by moving the last row into its place.
+
+        Args:
+            row (int): The row to remove.
+
+        Returns:
+            Optional[Entity]: The entity that was moved into the row, or None if the removed row was the last one.
+        """
+        entities = self.entities
+        last_row = self.count = self.count - 1
+        last = entities[last_row]
+        entities[last_row] = None
+        if row == last_row:
+            for column in self.columns.values():
+                if type(column) is list:
+                    column[last_row] = None
+            return None
+        entities[row] = last
+        for column in self.columns.values():
+            column[row] = column[last_row]
+            if type(column) is list:
+                column[last_row] = None
+        return last
+
+
+class Query:
+    """
+    A find query prepared once and reused, so the filter sets are not rebuilt every call.
+
+    Get one from World.prepare_query and iterate it like the result of World.find.
+    """
+
+    __slots__ = ("world", "component_types", "required", "excluded")
+
+    def __init__(
+        self,
+        world: World,
+        component_types: Tuple[Type, ...],
+        has: Optional[Type | List[Type] | Tuple[Type, ...]] = None,
+        without: Optional[Type | List[Type] | Tuple[Type, ...]] = None,
+    ) -> None:
+        self.world = world
+        self.component_types = component_types
+        self.required, self.excluded = _query_sets(component_types, has, without)
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        world = self.world
+        return world._rows(
+            self.component_types, world._match(self.required, self.excluded)
+        )
+
+    def arrays(self) -> Iterator[Tuple[Any, ...]]:
+        """
+        Find whole component columns, one archetype at a time. See World.find_arrays.
+        """
+        world = self.world
+        return world._columns(
+            self.component_types, world._match(self.required, self.excluded)
+        )
 
 
 """
 Naming Guide for if you really must shorten a variable in a comprehension or something:
 e = entity
-ie = internal_entity
 es = entities
 c = component
 cs = components
@@ -62,7 +446,98 @@ class World:
 
     def __init__(self) -> None:
         self.next_entity_id: int = 0
-        self.entities: Dict[Entity, InternalEntity] = {}
+        self.archetypes: Dict[frozenset, Archetype] = {}
+        self.entity_index: Dict[Entity, Tuple[Archetype, int]] = {}
+        self._query_cache: Dict[
+            Tuple[frozenset, frozenset], Tuple[int, int, List[Archetype]]
+        ] = {}
+        self._type_ids: Dict[Type[Any], int] = {}
+
+    def _archetype(self, component_types: Iterable[Type[Any]]) -> Archetype:
+        """
+        Get the archetype for a set of component types, creating it if needed.
+        Columns are ordered by when the world first saw each type, so every entity
+        with the same types gets its components back in the same order.
+        """
+        key = frozenset(component_types)
+        archetype = self.archetypes.get(key)
+        if archetype is None:
+            if np is not None and np.record in key:
+                raise TypeError(
+                    "cannot store a numpy record as a component; numeric components"
+                    " come back from get and find as records, pass the component class"
+                    " instance instead"
+                )
+            # Number new types in the order given, not the frozenset's order.
+            mask = self._type_mask(component_types)
+            archetype = self.archetypes[key] = Archetype(
+                sorted(key, key=self._type_ids.__getitem__), mask
+            )
+            self._cache_archetype(archetype)
+        return archetype
+
+    def _cache_archetype(self, archetype: Archetype) -> None:
+        """
+        Add a new archetype to the cached results of the queries it matches, leaving the rest alone.
+        The lists are replaced rather than appended to, so callers iterating an old list are unaffected.
+        """
+        mask = archetype.mask
+        query_cache = self._query_cache
+        for query_key, cached in query_cache.items():
+            required_mask, excluded_mask, archetypes = cached
+            if mask & required_mask == required_mask and not mask & excluded_mask:
+                query_cache[query_key] = (
+                    required_mask,
+                    excluded_mask,
+                    [*archetypes, archetype],
+                )
+
+    def _attach(self, entity: Entity, components: Dict[Type[Any], Any]) -> None:
+        """
+        Store an entity in the archetype matching its component types.
+        """
+        archetype = self._archetype(components)
+        self.entity_index[entity] = (archetype, archetype.append(entity, components))
+
+    def _move(
+        self,
+        entity: Entity,
+        archetype: Archetype,
+        row: int,
+        destination: Archetype,
+        components: Dict[Type[Any], Any],
+    ) -> None:
+        """
+        Move an entity's row to another archetype, overwriting or adding the given components.
+        Components the destination does not hold are dropped.
+        """
+        if destination is archetype:
+            archetype.put(row, components)
+            return
+        new_row = destination.append_moved(entity, archetype, row, components)
+        self._remove_row(archetype, row)
+        self.entity_index[entity] = (destination, new_row)
+
+    def _type_mask(self, component_types: Iterable[Type[Any]]) -> int:
+        """
+        Get a bitmask with one bit set per component type, numbering types the first time they are seen.
+        """
+        type_ids = self._type_ids
+        mask = 0
+        for component_type in component_types:
+            type_id = type_ids.get(component_type)
+            if type_id is None:
+                type_id = type_ids[component_type] = len(type_ids)
+            mask |= 1 << type_id
+        return mask
+
+    def _remove_row(self, archetype: Archetype, row: int) -> None:
+        """
+        Swap-remove a row from an archetype, fixing up the index of the entity moved into it.
+        """
+        moved = archetype.swap_remove(row)
+        if moved is not None:
+            self.entity_index[moved] = (archetype, row)
 
     def spawn(self, *components: Any) -> Entity:
         """
@@ -75,12 +550,26 @@ class World:
             The newly created entity.
 
         """
-        entity = Entity(self.next_entity_id)
-        self.next_entity_id += 1
-        internal_entity = InternalEntity(entity)
-        self.entities[entity] = internal_entity
-        for component in components:
-            internal_entity.components[type(component)] = component
+        _type = type
+        entity = self.next_entity_id
+        self.next_entity_id = entity + 1
+        self._attach(entity, {_type(c): c for c in components})
+        return entity
+
+    def spawn_typed(self, components: Iterable[Tuple[Type, Any]]) -> Entity:
+        """
+        Creates a new entity from (component type, component) pairs, trusting the given types.
+        Skips the type() call per component that spawn makes, for bulk spawning.
+
+        Args:
+            components (Iterable[Tuple[Type, Any]]): The component types and components to add to the entity.
+
+        Returns:
+            Entity: The newly created entity.
+        """
+        entity = self.next_entity_id
+        self.next_entity_id = entity + 1
+        self._attach(entity, dict(components))
         return entity
 
     def spawn_at(self, entity: Entity, *components: Any) -> None:
@@ -91,10 +580,16 @@ class World:
             entity (Entity): The entity to add components to.
             *components (Any): The components to add to the entity.
         """
-        internal_entity = InternalEntity(entity)
-        self.entities[entity] = internal_entity
-        for component in components:
-            internal_entity.components[type(component)] = component
+        _type = type
+        entity_components = {_type(c): c for c in components}
+        archetype = self._archetype(entity_components)
+        location = self.entity_index.get(entity)
+        if location is not None:
+            self._remove_row(*location)
+        # Keep spawn from handing out this id again.
+        self.next_entity_id = max(self.next_entity_id, entity + 1)
+        row = archetype.append(entity, entity_components)
+        self.entity_index[entity] = (archetype, row)
 
     def despawn(self, entity: Entity) -> Optional[Error]:
         """
@@ -106,16 +601,18 @@ class World:
         Returns:
             Optional[Error]: An error if the entity does not exist in the world, None otherwise.
         """
-        if entity in self.entities:
-            del self.entities[entity]
-        else:
+        location = self.entity_index.pop(entity, None)
+        if location is None:
             return Error.NoSuchEntity
+        self._remove_row(*location)
 
     def clear(self) -> None:
         """
         Remove all entities from the world.
         """
-        self.entities.clear()
+        self.archetypes.clear()
+        self.entity_index.clear()
+        self._query_cache.clear()
 
     def contains(self, entity: Entity) -> bool:
         """
@@ -127,7 +624,7 @@ class World:
         Returns:
             bool: True if the entity exists in the world, False otherwise.
         """
-        return entity in self.entities
+        return entity in self.entity_index
 
     def find(
         self,
@@ -138,40 +635,189 @@ class World:
         """
         Find entities that have the specified component types and meet the optional conditions.
 
+        Systems may spawn, insert, remove and despawn while looping. Every entity that
+        matched is still yielded, and one despawned or stripped of a queried component
+        before its turn comes with its components as they were, detached from the world.
+
+        The matching rows are taken when find is called, not on the first next(), so
+        entities spawned between the call and the loop are left out, and even
+        next(world.find(T), None) copies every matching row. Call find right where
+        you loop over it.
+
         Args:
             *component_types (Type): The component types to search for.
             has (Optional[Type | List[Type] | Tuple[Type, ...]]): The component types that the entities must have.
             without (Optional[Type | List[Type] | Tuple[Type, ...]]): The component types that the entities must not have.
 
-        Yields:
+        Returns:
             Iterator[Tuple[Any, ...]]: An iterator of tuples representing the found entities and their components.
         """
-        has = (
-            has
-            if isinstance(has, (list, tuple))
-            else [has]
-            if has is not None
-            else None
+        return self._rows(
+            component_types, self._match(*_query_sets(component_types, has, without))
         )
-        without = (
-            without
-            if isinstance(without, (list, tuple))
-            else [without]
-            if without is not None
-            else None
+
+    def find_list(
+        self,
+        *component_types: Type,
+        has: Optional[Type | List[Type] | Tuple[Type, ...]] = None,
+        without: Optional[Type | List[Type] | Tuple[Type, ...]] = None,
+    ) -> List[Tuple[Any, ...]]:
+        """
+        Like find, but returns every result at once as a list. Use it when all results are needed anyway.
+
+        Args:
+            *component_types (Type): The component types to search for.
+            has (Optional[Type | List[Type] | Tuple[Type, ...]]): The component types that the entities must have.
+            without (Optional[Type | List[Type] | Tuple[Type, ...]]): The component types that the entities must not have.
+
+        Returns:
+            List[Tuple[Any, ...]]: A list of tuples representing the found entities and their components.
+        """
+        return list(
+            self._rows(
+                component_types,
+                self._match(*_query_sets(component_types, has, without)),
+            )
         )
 
-        for internal_entity in self.entities.values():
-            if has and any(c not in internal_entity.components for c in has):
-                continue
-            if without and any(c in internal_entity.components for c in without):
+    def prepare_query(
+        self,
+        *component_types: Type,
+        has: Optional[Type | List[Type] | Tuple[Type, ...]] = None,
+        without: Optional[Type | List[Type] | Tuple[Type, ...]] = None,
+    ) -> Query:
+        """
+        Prepare a find query to reuse every frame, e.g. once when a system is set up.
+
+        Args:
+            *component_types (Type): The component types to search for.
+            has (Optional[Type | List[Type] | Tuple[Type, ...]]): The component types that the entities must have.
+            without (Optional[Type | List[Type] | Tuple[Type, ...]]): The component types that the entities must not have.
+
+        Returns:
+            Query: A query that yields the same tuples as find each time it is iterated.
+        """
+        return Query(self, component_types, has, without)
+
+    def _rows(
+        self, component_types: Tuple[Type, ...], archetypes: List[Archetype]
+    ) -> Iterator[Tuple[Any, ...]]:
+        """
+        Iterate an entity and its requested components for every row of the archetypes.
+        Rows are built by zip and chained together in C, so no Python code runs per row.
+        """
+        # Matching rows are copied up front so systems may insert, remove or
+        # despawn while iterating without entities moving under the loop. Every
+        # entity that matched is yielded, even if it is despawned or loses a
+        # component before its turn; it then comes with its components as they
+        # were when find was called.
+        # Numeric rows are views into arrays that swap-remove and growth move
+        # under the loop, so those archetypes look each entity up as it is
+        # yielded and only fall back to a copy of the column when it is gone.
+        zip_rows = _row_zipper(len(component_types))
+        matches = []
+        append = matches.append
+        for archetype in archetypes:
+            count = archetype.count
+            columns = archetype.columns
+            if any(type(columns[c]) is not list for c in component_types):
+                snapshot = {}
+                for c in component_types:
+                    column = columns[c]
+                    snapshot[c] = (
+                        column if type(column) is list else column[:count].copy()
+                    )
+                rows = zip_rows(
+                    archetype.entities[:count], snapshot, count, *component_types
+                )
+                append(self._live_rows(archetype, component_types, rows))
                 continue
-            if all(c in internal_entity.components for c in component_types):
+            append(
+                zip_rows(archetype.entities[:count], columns, count, *component_types)
+            )
+        return chain.from_iterable(matches)
+
+    def _live_rows(
+        self,
+        archetype: Archetype,
+        component_types: Tuple[Type, ...],
+        rows: Iterator[Tuple[Any, ...]],
+    ) -> Iterator[Tuple[Any, ...]]:
+        """
+        Yield each snapshot row with its components read from wherever the entity is stored now.
+        Entities that were despawned or lost a requested component keep their snapshot row.
+        """
+        get_location = self.entity_index.get
+        for entity, *snapshot in rows:
+            location = get_location(entity)
+            if location is not None:
+                current, row = location
+                columns = current.columns
+                if current is archetype or all(c in columns for c in component_types):
+                    yield (entity, *[columns[c][row] for c in component_types])
+                    continue
+            yield (entity, *snapshot)
+
+    def find_arrays(
+        self,
+        *component_types: Type,
+        has: Optional[Type | List[Type] | Tuple[Type, ...]] = None,
+        without: Optional[Type | List[Type] | Tuple[Type, ...]] = None,
+    ) -> Iterator[Tuple[Any, ...]]:
+        """
+        Find whole component columns, one archetype at a time, for vectorized systems.
+
+        Numeric components come back as NumPy record array views, so writes like
+        pos.x += vel.dx update every matching entity in one call. Other components
+        come back as lists. The entities come back as a NumPy array, or as a list
+        when numpy is not installed.
+
+        Args:
+            *component_types (Type): The component types to search for.
+            has (Optional[Type | List[Type] | Tuple[Type, ...]]): The component types that the entities must have.
+            without (Optional[Type | List[Type] | Tuple[Type, ...]]): The component types that the entities must not have.
+
+        Yields:
+            Iterator[Tuple[Any, ...]]: An iterator of tuples holding an array of entities followed by one column per component type.
+        """
+        return self._columns(
+            component_types, self._match(*_query_sets(component_types, has, without))
+        )
+
+    def _columns(
+        self, component_types: Tuple[Type, ...], archetypes: List[Archetype]
+    ) -> Iterator[Tuple[Any, ...]]:
+        """
+        Yield the entities and requested component columns of each non-empty archetype.
+        """
+        for archetype in archetypes:
+            count = archetype.count
+            if count:
+                entities = archetype.entities[:count]
                 yield (
-                    internal_entity.entity,
-                    *(internal_entity.components[c] for c in component_types),
+                    np.array(entities) if np is not None else entities,
+                    *(archetype.columns[c][:count] for c in component_types),
                 )
-        yield from []
+
+    def _match(self, required: frozenset, excluded: frozenset) -> List[Archetype]:
+        """
+        Get the archetypes holding every required component type and none of the excluded ones.
+        Results are cached, and new archetypes are added to them as they are created.
+        """
+        query_key = (required, excluded)
+        cached = self._query_cache.get(query_key)
+        if cached is not None:
+            return cached[2]
+        required_mask = self._type_mask(required)
+        excluded_mask = self._type_mask(excluded)
+        archetypes = [
+            archetype
+            for archetype in self.archetypes.values()
+            if archetype.mask & required_mask == required_mask
+            and not archetype.mask & excluded_mask
+        ]
+        self._query_cache[query_key] = (required_mask, excluded_mask, archetypes)
+        return archetypes
 
     def find_on(
         self,
@@ -192,31 +838,16 @@ class World:
         Returns:
             Tuple[Any, ...] | None: A tuple containing the entity and the retrieved components, or None if no matching components are found.
         """
-        if entity not in self.entities:
-            yield from []
-        internal_entity = self.entities[entity]
-
-        if has:
-            if isinstance(has, (list, tuple)):
-                if any(c not in internal_entity.components for c in has):
-                    yield from []
-            elif has not in internal_entity.components:
-                yield from []
-
-        if without:
-            if isinstance(without, (list, tuple)):
-                if any(c in internal_entity.components for c in without):
-                    yield from []
-            elif without in internal_entity.components:
-                yield from []
-
-        if all(c in internal_entity.components for c in component_types):
-            yield (
-                internal_entity.entity,
-                *(internal_entity.components[c] for c in component_types),
-            )
+        location = self.entity_index.get(entity)
+        if location is None:
+            return
+        archetype, row = location
+        key = archetype.key
 
-        yield from []
+        required, excluded = _query_sets(component_types, has, without)
+        if required.issubset(key) and excluded.isdisjoint(key):
+            columns = archetype.columns
+            yield (entity, *[columns[c][row] for c in component_types])
 
     def get(self, entity: Entity, component_type: Type) -> Any | None:
         """
@@ -229,12 +860,11 @@ class World:
         Returns:
             Any | None: The component if found, None otherwise.
         """
-        if (
-            entity in self.entities
-            and component_type in self.entities[entity].components
-        ):
-            return self.entities[entity].components[component_type]
-        return None
+        location = self.entity_index.get(entity)
+        if location is None:
+            return None
+        column = location[0].columns.get(component_type)
+        return None if column is None else column[location[1]]
 
     def satisfies(
         self,
@@ -253,25 +883,19 @@ class World:
         Returns:
             bool: True if the entity satisfies the conditions, False otherwise.
         """
-        if entity not in self.entities:
+        location = self.entity_index.get(entity)
+        if location is None:
             return False
-        internal_entity = self.entities[entity]
+        key = location[0].key
 
-        if has:
-            if isinstance(has, (list, tuple)):
-                if any(c not in internal_entity.components for c in has):
-                    return False
-            elif has not in internal_entity.components:
-                return False
+        # A single type in has or without, the common call, needs no set lookup.
+        if without is None and type(has) is type:
+            return has in key
+        if has is None and type(without) is type:
+            return without not in key
 
-        if without:
-            if isinstance(without, (list, tuple)):
-                if any(c in internal_entity.components for c in without):
-                    return False
-            elif without in internal_entity.components:
-                return False
-
-        return True
+        required, excluded = _query_sets((), has, without)
+        return required.issubset(key) and excluded.isdisjoint(key)
 
     def is_empty(self, entity: Entity) -> bool:
         """
@@ -283,7 +907,8 @@ class World:
         Returns:
             bool: True if the entity has no components, False otherwise.
         """
-        return entity in self.entities and not self.entities[entity].components
+        location = self.entity_index.get(entity)
+        return location is not None and not location[0].key
 
     def insert(self, entity: Entity, *components: Any) -> None | Error:
         """
@@ -296,11 +921,18 @@ class World:
         Returns:
             None | Error: None if successful, or an error if the entity does not exist in the world.
         """
-        if entity in self.entities:
-            for component in components:
-                self.entities[entity].components[type(component)] = component
-        else:
+        location = self.entity_index.get(entity)
+        if location is None:
             return Error.NoSuchEntity
+        _type = type
+        archetype, row = location
+        entity_components = {_type(c): c for c in components}
+        added = tuple(entity_components)
+        destination = archetype.add_edges.get(added)
+        if destination is None:
+            types = (*archetype.columns, *added)
+            destination = archetype.add_edges[added] = self._archetype(types)
+        self._move(entity, archetype, row, destination, entity_components)
 
     def remove(self, entity: Entity, *component_types: Type) -> None:
         """
@@ -310,45 +942,71 @@ class World:
             entity (Entity): The entity to remove components from.
             *component_types (Type): The types of components to remove.
         """
-        if entity in self.entities:
-            internal_entity = self.entities[entity]
-            for component_type in component_types:
-                if component_type in internal_entity.components:
-                    del internal_entity.components[component_type]
+        location = self.entity_index.get(entity)
+        if location is None:
+            return
+        archetype, row = location
+        destination = archetype.remove_edges.get(component_types)
+        if destination is None:
+            types = archetype.key.difference(component_types)
+            destination = self._archetype(types)
+            archetype.remove_edges[component_types] = destination
+        self._move(entity, archetype, row, destination, {})
 
     def take(self, entity: Entity) -> tuple:
         """
         Remove an entity from the world and return its components.
 
+        The components are ordered by when the world first saw each component type,
+        not by the order they were given to spawn or insert. Use take_dict to get
+        them by type.
+
         Args:
             entity (Entity): The entity to remove.
 
         Returns:
             tuple: A tuple containing the components of the entity.
         """
-        if entity in self.entities:
-            internal_entity = self.entities[entity]
-            components = tuple(internal_entity.components.values())
-            self.despawn(entity)
-            return components
-        return ()
+        return tuple(self.take_dict(entity).values())
+
+    def take_dict(self, entity: Entity) -> Dict[Type[Any], Any]:
+        """
+        Remove an entity from the world and return its components keyed by type.
+        Skips building the tuple take returns, e.g. when moving an entity to another world.
+
+        Args:
+            entity (Entity): The entity to remove.
+
+        Returns:
+            Dict[Type[Any], Any]: The components of the entity, or an empty dict if it does not exist.
+        """
+        location = self.entity_index.pop(entity, None)
+        if location is None:
+            return {}
+        archetype, row = location
+        components = archetype.row(row)
+        self._remove_row(archetype, row)
+        return components
 
     def iter(self) -> Iterator[Entity]:
         """
         Iterate over all entities in the world.
 
-        Yields:
+        Returns:
             Iterator[Entity]: An iterator of entities.
         """
-        for _, internal_entity in self.entities.items():
-            yield internal_entity.entity
+        return iter(self.entity_index)
 
     def iter_every(self) -> Iterator[Tuple[Entity, Tuple[Any, ...]]]:
         """
         Iterate over all entities and their components in the world.
 
+        Each entity's components are ordered by when the world first saw each
+        component type, as with take. Use get or take_dict to look them up by type.
+
         Yields:
             Iterator[Tuple[Entity, Tuple[Any, ...]]]: An iterator of tuples representing the entities and their components.
         """
-        for entity, internal_entity in self.entities.items():
-            yield entity, tuple(internal_entity.components.values())
+        for entity, (archetype, row) in self.entity_index.items():
+            columns = archetype.columns.values()
+            yield entity, tuple([column[row] for column in columns])
@@ -13,6 +13,7 @@ setup(
     author_email="668es218pur@gmail.com",
     license="GPLv3",
     install_requires=[],
+    extras_require={"numpy": ["numpy"], "numba": ["numpy", "numba"]},
     classifiers=[
         "Programming Language :: Python :: 3",
         "License :: OSI Approved :: GNU General Public License v3 (GPLv3)",
@@ -1,7 +1,9 @@
+import subprocess
+import sys
 import unittest
 from dataclasses import dataclass
 
-from phecs.phecs import World
+from phecs.phecs import Error, World, jit_system, np, numeric_component, prange
 
 
 @dataclass
@@ -31,6 +33,26 @@ class Name:
     value: str
 
 
+if np is not None:
+
+    @numeric_component([("x", "f4"), ("y", "f4")])
+    @dataclass
+    class Point:
+        x: float
+        y: float
+
+    @numeric_component([("value", "i4")])
+    @dataclass(frozen=True)
+    class Mass:
+        value: int
+
+    @numeric_component([("dx", "f4"), ("dy", "f4")])
+    @dataclass
+    class Step:
+        dx: float
+        dy: float
+
+
 class TestPhecsWorld(unittest.TestCase):
     def test_world(self):
         world = World()
@@ -70,6 +92,27 @@ class PhecsWorldFind(unittest.TestCase):
             [(entity, Position(1, 1)), (entity2, Position(2, 2))],
         )
 
+    def test_find_snapshot_at_call(self):
+        world = World()
+
+        entity = world.spawn(Health(1))
+        found = world.find(Health)
+        world.spawn(Health(2))
+
+        self.assertEqual(list(found), [(entity, Health(1))])
+
+    def test_find_list(self):
+        world = World()
+
+        entity = world.spawn(Position(1, 1), Velocity(1, 1))
+        world.spawn(Position(2, 2), IsDead(True))
+
+        self.assertEqual(
+            world.find_list(Position, Velocity, without=IsDead),
+            [(entity, Position(1, 1), Velocity(1, 1))],
+        )
+        self.assertEqual(world.find_list(Health), [])
+
     def test_find_has(self):
         world = World()
 
@@ -132,6 +175,18 @@ class PhecsWorldFind(unittest.TestCase):
             [(entity, Position(1, 1), Velocity(1, 1))],
         )
 
+    def test_find_many(self):
+        world = World()
+
+        entity = world.spawn(Position(1, 1), Velocity(1, 1), Health(1), Name("a"))
+        world.spawn(Position(2, 2), Velocity(2, 2), Health(2))
+
+        self.assertEqual(
+            list(world.find(Position, Velocity, Health, Name)),
+            [(entity, Position(1, 1), Velocity(1, 1), Health(1), Name("a"))],
+        )
+        self.assertEqual(len(list(world.find())), 2)
+
     def test_find_has_multiple(self):
         world = World()
 
@@ -209,6 +264,24 @@ class PhecsEntity(unittest.TestCase):
         self.assertEqual(entity, 0)
         entity = world.spawn()
         self.assertEqual(entity, 1)
+        self.assertIs(type(entity), int)
+
+    def test_iter(self):
+        world = World()
+        entities = [world.spawn(Position(i, i)) for i in range(3)]
+        world.despawn(entities[1])
+
+        self.assertEqual(list(world.iter()), [entities[0], entities[2]])
+
+    def test_spawn_typed(self):
+        world = World()
+        entity = world.spawn_typed([(Position, Position(1, 1)), (Health, Health(1))])
+        other = world.spawn(Position(2, 2), Health(2))
+
+        self.assertEqual(
+            list(world.find(Position, Health)),
+            [(entity, Position(1, 1), Health(1)), (other, Position(2, 2), Health(2))],
+        )
 
     def test_add_one_component(self):
         world = World()
@@ -231,6 +304,31 @@ class PhecsEntity(unittest.TestCase):
         self.assertEqual(p, Position(1, 1))
         self.assertEqual(v, Velocity(1, 1))
 
+    def test_find_on_filters(self):
+        world = World()
+        entity = world.spawn(Position(1, 1), IsDead(True))
+
+        self.assertEqual(list(world.find_on(entity, Position, has=Velocity)), [])
+        self.assertEqual(list(world.find_on(entity, Position, without=IsDead)), [])
+        self.assertEqual(list(world.find_on(entity, Velocity)), [])
+        self.assertEqual(
+            list(world.find_on(entity, Position, has=IsDead)),
+            [(entity, Position(1, 1))],
+        )
+
+        world.despawn(entity)
+        self.assertEqual(list(world.find_on(entity, Position)), [])
+
+    def test_missing_entity(self):
+        world = World()
+        entity = world.spawn(Position(1, 1))
+
+        self.assertIsNone(world.despawn(entity))
+        self.assertEqual(world.despawn(entity), Error.NoSuchEntity)
+        self.assertEqual(world.insert(entity, Velocity(1, 1)), Error.NoSuchEntity)
+        self.assertIsNone(world.remove(entity, Position))
+        self.assertEqual(world.take(entity), ())
+
     def test_remove_components(self):
         world = World()
         entity = world.spawn()
@@ -251,3 +349,423 @@ class PhecsEntity(unittest.TestCase):
         world.insert(entity, Position(1, 1))
 
         self.assertFalse(world.is_empty(entity))
+
+        world.remove(entity, Position)
+        self.assertTrue(world.is_empty(entity))
+
+        world.despawn(entity)
+        self.assertFalse(world.is_empty(entity))
+
+
+class PhecsArchetypes(unittest.TestCase):
+    def test_despawn_keeps_other_rows(self):
+        world = World()
+
+        entities = [world.spawn(Position(i, i), Velocity(i, i)) for i in range(4)]
+        world.despawn(entities[1])
+
+        self.assertFalse(world.contains(entities[1]))
+        for i in (0, 2, 3):
+            self.assertEqual(world.get(entities[i], Position), Position(i, i))
+            self.assertEqual(world.get(entities[i], Velocity), Velocity(i, i))
+
+    def test_find_arrays_objects(self):
+        world = World()
+
+        entities = [world.spawn(Health(i)) for i in range(3)]
+        (ids, healths), = world.find_arrays(Health)
+
+        self.assertEqual(list(ids), entities)
+        self.assertEqual(healths, [Health(0), Health(1), Health(2)])
+
+    def test_despawn_moved_entity(self):
+        world = World()
+
+        entities = [world.spawn(Position(i, i)) for i in range(3)]
+        world.despawn(entities[0])
+        world.despawn(entities[2])
+
+        self.assertEqual(list(world.find(Position)), [(entities[1], Position(1, 1))])
+        world.despawn(entities[1])
+        self.assertEqual(list(world.find(Position)), [])
+
+    def test_despawn_ahead_while_iterating(self):
+        world = World()
+
+        entities = [world.spawn(Health(i)) for i in range(3)]
+        seen = []
+        for entity, health in world.find(Health):
+            seen.append((entity, health))
+            if entity == entities[0]:
+                world.despawn(entities[1])
+
+        self.assertEqual(
+            seen,
+            [(entities[0], Health(0)), (entities[1], Health(1)), (entities[2], Health(2))],
+        )
+
+    def test_grow_after_despawn(self):
+        world = World()
+
+        entities = [world.spawn(Health(i)) for i in range(20)]
+        for entity in entities[::2]:
+            world.despawn(entity)
+        entities = entities[1::2] + [world.spawn(Health(i)) for i in range(20, 30)]
+
+        self.assertEqual(
+            sorted(e for e, _ in world.find(Health)),
+            sorted(entities),
+        )
+        self.assertEqual(world.get(entities[-1], Health), Health(29))
+
+    def test_spawn_after_spawn_at(self):
+        world = World()
+
+        world.spawn_at(0, Position(1, 1))
+        entity = world.spawn(Position(2, 2))
+        self.assertNotEqual(entity, 0)
+        self.assertEqual(
+            list(world.find(Position)),
+            [(0, Position(1, 1)), (entity, Position(2, 2))],
+        )
+
+        world.despawn(0)
+        self.assertEqual(list(world.find(Position)), [(entity, Position(2, 2))])
+
+    def test_insert_moves_archetype(self):
+        world = World()
+
+        entity = world.spawn(Position(1, 1))
+        other = world.spawn(Position(2, 2))
+        world.insert(entity, Velocity(1, 1))
+
+        self.assertEqual(
+            list(world.find(Position, Velocity)),
+            [(entity, Position(1, 1), Velocity(1, 1))],
+        )
+        self.assertEqual(
+            list(world.find(Position, without=Velocity)), [(other, Position(2, 2))]
+        )
+
+    def test_remove_moves_archetype(self):
+        world = World()
+
+        entity = world.spawn(Position(1, 1), Velocity(1, 1))
+        world.remove(entity, Velocity)
+
+        self.assertEqual(world.get(entity, Position), Position(1, 1))
+        self.assertIsNone(world.get(entity, Velocity))
+        self.assertEqual(list(world.find(Velocity)), [])
+
+    def test_toggle_component(self):
+        world = World()
+
+        entity = world.spawn(Position(1, 1), Health(1))
+        other = world.spawn(Position(2, 2), Health(2))
+        for _ in range(3):
+            world.insert(entity, IsDead(True))
+            world.remove(entity, IsDead)
+
+        self.assertEqual(len(world.archetypes), 2)
+        self.assertEqual(world.take(entity), (Position(1, 1), Health(1)))
+        self.assertEqual(world.get(other, Health), Health(2))
+
+    def test_insert_replaces_component(self):
+        world = World()
+
+        entity = world.spawn(Position(1, 1), Velocity(1, 1))
+        world.insert(entity, Velocity(2, 2))
+
+        self.assertEqual(
+            list(world.find(Position, Velocity)),
+            [(entity, Position(1, 1), Velocity(2, 2))],
+        )
+
+    def test_insert_while_iterating(self):
+        world = World()
+
+        entities = [world.spawn(Health(0)) for _ in range(3)]
+        world.spawn(Health(0), IsDead(True))
+
+        for entity, _ in world.find(Health, without=IsDead):
+            world.insert(entity, IsDead(True))
+
+        self.assertEqual(
+            [e for e, _ in world.find(Health, has=IsDead)][1:],
+            entities,
+        )
+
+    def test_take(self):
+        world = World()
+
+        entity = world.spawn(Position(1, 1), Velocity(1, 1))
+        other = world.spawn(Position(2, 2), Velocity(2, 2))
+
+        self.assertEqual(world.take(entity), (Position(1, 1), Velocity(1, 1)))
+        self.assertFalse(world.contains(entity))
+        self.assertEqual(world.get(other, Position), Position(2, 2))
+
+    def test_component_order(self):
+        world = World()
+
+        world.spawn(Health(1), Position(1, 1))
+        entity = world.spawn(Position(2, 2), Health(2))
+        other = world.spawn(Velocity(3, 3), Position(3, 3))
+
+        self.assertEqual(
+            dict(world.iter_every())[entity], (Health(2), Position(2, 2))
+        )
+        self.assertEqual(world.take(entity), (Health(2), Position(2, 2)))
+        self.assertEqual(world.take(other), (Position(3, 3), Velocity(3, 3)))
+
+    def test_take_dict(self):
+        world = World()
+        other_world = World()
+
+        entity = world.spawn(Position(1, 1), Velocity(1, 1))
+        components = world.take_dict(entity)
+
+        self.assertEqual(
+            components, {Position: Position(1, 1), Velocity: Velocity(1, 1)}
+        )
+        self.assertFalse(world.contains(entity))
+        self.assertEqual(world.take_dict(entity), {})
+
+        moved = other_world.spawn(*components.values())
+        self.assertEqual(other_world.get(moved, Velocity), Velocity(1, 1))
+
+    def test_query_cache_sees_new_archetypes(self):
+        world = World()
+
+        entity = world.spawn(Position(1, 1))
+        self.assertEqual(list(world.find(Position)), [(entity, Position(1, 1))])
+
+        other = world.spawn(Position(2, 2), Velocity(2, 2))
+        self.assertEqual(
+            list(world.find(Position)),
+            [(entity, Position(1, 1)), (other, Position(2, 2))],
+        )
+
+    def test_query_cache_adds_matching_archetypes(self):
+        world = World()
+
+        entity = world.spawn(Position(1, 1))
+        query = world.prepare_query(Position, without=IsDead)
+        self.assertEqual(list(query), [(entity, Position(1, 1))])
+
+        world.spawn(Velocity(1, 1))
+        world.spawn(Position(2, 2), IsDead(True))
+        other = world.spawn(Position(3, 3), Health(3))
+
+        self.assertEqual(
+            list(query), [(entity, Position(1, 1)), (other, Position(3, 3))]
+        )
+
+    def test_prepare_query(self):
+        world = World()
+
+        query = world.prepare_query(Position, has=Velocity, without=IsDead)
+        self.assertEqual(list(query), [])
+
+        entity = world.spawn(Position(1, 1), Velocity(1, 1))
+        world.spawn(Position(2, 2), Velocity(2, 2), IsDead(True))
+        self.assertEqual(list(query), [(entity, Position(1, 1))])
+
+        world.clear()
+        self.assertEqual(list(query), [])
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class PhecsNumericComponents(unittest.TestCase):
+    def test_find_writes_through(self):
+        world = World()
+
+        entity = world.spawn(Point(1, 2), Step(1, 1), Name("a"))
+        for _, point, step in world.find(Point, Step):
+            point.x += step.dx
+
+        self.assertEqual(world.get(entity, Point).x, 2)
+        self.assertEqual(world.get(entity, Name), Name("a"))
+
+    def test_find_arrays(self):
+        world = World()
+
+        entities = [world.spawn(Point(i, i), Step(1, 2)) for i in range(20)]
+        world.spawn(Point(0, 0))
+
+        batches = list(world.find_arrays(Point, Step))
+        self.assertEqual(len(batches), 1)
+        ids, points, steps = batches[0]
+        self.assertEqual(list(ids), entities)
+
+        points.x += steps.dx
+        points["y"] += steps["dy"]
+        self.assertEqual(world.get(entities[5], Point).x, 6)
+        self.assertEqual(world.get(entities[5], Point).y, 7)
+
+    def test_despawn_and_take(self):
+        world = World()
+
+        entities = [world.spawn(Point(i, i)) for i in range(3)]
+        world.despawn(entities[0])
+
+        self.assertEqual(world.get(entities[2], Point).x, 2)
+        self.assertEqual(world.take(entities[1]), (Point(1, 1),))
+        self.assertEqual([e for e, _ in world.find(Point)], [entities[2]])
+
+    def test_insert_while_iterating(self):
+        world = World()
+
+        entities = [world.spawn(Point(i, i)) for i in range(3)]
+        world.spawn(Point(0, 0), IsDead(True))
+
+        for entity, point in world.find(Point, without=IsDead):
+            point.x += 10
+            world.insert(entity, IsDead(True))
+
+        self.assertEqual(
+            [e for e, _ in world.find(Point, has=IsDead)][1:],
+            entities,
+        )
+        for i, entity in enumerate(entities):
+            self.assertEqual(world.get(entity, Point).x, i + 10)
+
+    def test_despawn_while_iterating(self):
+        world = World()
+
+        entities = [world.spawn(Point(0, 0)) for _ in range(3)]
+        for entity, point in world.find(Point):
+            if entity == entities[0]:
+                world.despawn(entity)
+            else:
+                point.x += 10 * entity
+
+        self.assertFalse(world.contains(entities[0]))
+        self.assertEqual(world.get(entities[1], Point).x, 10)
+        self.assertEqual(world.get(entities[2], Point).x, 20)
+
+    def test_remove_while_iterating(self):
+        world = World()
+
+        entities = [world.spawn(Point(0, 0), Step(1, 1)) for _ in range(3)]
+        for entity, point in world.find(Point):
+            if entity == entities[0]:
+                world.remove(entity, Point)
+            else:
+                point.x += 10 * entity
+
+        self.assertIsNone(world.get(entities[0], Point))
+        self.assertEqual(world.get(entities[1], Point).x, 10)
+        self.assertEqual(world.get(entities[2], Point).x, 20)
+
+    def test_despawn_ahead_while_iterating(self):
+        world = World()
+
+        entities = [world.spawn(Point(i, i)) for i in range(3)]
+        seen = []
+        for entity, point in world.find(Point):
+            seen.append((entity, float(point.x)))
+            if entity == entities[0]:
+                world.despawn(entities[1])
+
+        self.assertEqual(seen, [(entities[0], 0), (entities[1], 1), (entities[2], 2)])
+
+    def test_spawn_while_iterating(self):
+        world = World()
+
+        entities = [world.spawn(Point(i, i)) for i in range(8)]
+        for entity, point in world.find(Point):
+            point.x += 100
+            if entity == entities[0]:
+                world.spawn(Point(0, 0))
+
+        for i, entity in enumerate(entities):
+            self.assertEqual(world.get(entity, Point).x, i + 100)
+
+    def test_growth_invalidates_records(self):
+        world = World()
+
+        entities = [world.spawn(Point(i, i)) for i in range(8)]
+        point = world.get(entities[0], Point)
+        world.spawn(Point(0, 0))
+        point.x += 100
+
+        self.assertEqual(world.get(entities[0], Point).x, 0)
+
+    def test_take_frozen(self):
+        world = World()
+        entity = world.spawn(Mass(3))
+        other = world.spawn(Mass(4))
+
+        self.assertEqual(world.take(entity), (Mass(3),))
+        self.assertEqual(world.take_dict(other), {Mass: Mass(4)})
+
+    def test_rejects_records(self):
+        world = World()
+        entity = world.spawn(Point(1, 2))
+        other = world.spawn(Name("a"))
+        record = world.get(entity, Point)
+
+        with self.assertRaises(TypeError):
+            world.insert(other, record)
+        with self.assertRaises(TypeError):
+            world.spawn_at(other, record)
+        with self.assertRaises(TypeError):
+            world.spawn(record)
+        self.assertEqual(world.get(other, Name), Name("a"))
+
+    def test_insert_keeps_values(self):
+        world = World()
+
+        entity = world.spawn(Point(3, 4))
+        world.insert(entity, Step(1, 1))
+
+        self.assertEqual(world.get(entity, Point).y, 4)
+        self.assertEqual(world.get(entity, Step).dx, 1)
+
+    def test_jit_system(self):
+        world = World()
+
+        entities = [world.spawn(Point(i, i), Step(1, 2)) for i in range(10)]
+        still = world.spawn(Point(0, 0), Step(1, 1), IsDead(True))
+
+        @jit_system(Point, Step, without=IsDead)
+        def physics(x, y, dx, dy, n):
+            for i in prange(n):
+                x[i] += dx[i]
+                y[i] += dy[i]
+
+        physics(world)
+
+        self.assertEqual(tuple(world.get(entities[3], Point)), (4, 5))
+        self.assertEqual(tuple(world.get(still, Point)), (0, 0))
+
+    def test_jit_system_without_cache_locator(self):
+        world = World()
+        entity = world.spawn(Point(1, 1), Step(2, 3))
+
+        namespace = {"jit_system": jit_system, "Point": Point, "Step": Step}
+        exec(
+            "@jit_system(Point, Step)\n"
+            "def physics(x, y, dx, dy, n):\n"
+            "    for i in range(n):\n"
+            "        x[i] += dx[i]\n",
+            namespace,
+        )
+        namespace["physics"](world)
+
+        self.assertEqual(world.get(entity, Point).x, 3)
+
+    def test_import_does_not_load_numba(self):
+        loaded = subprocess.run(
+            [sys.executable, "-c", "import sys, phecs; print('numba' in sys.modules)"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+
+        self.assertEqual(loaded, "False")
+
+    def test_jit_system_rejects_object_components(self):
+        with self.assertRaises(TypeError):
+            jit_system(Point, Name)